@@ -8,10 +8,15 @@ Compact Gradio UI for the personal chatbot (PROFILE-based).
 
 import os
 import pathlib
+import re
 import subprocess
-from typing import Dict, Any, Callable, List
+import threading
+import unicodedata
+from collections import Counter
+from typing import Dict, Any, Callable, List, Optional
 
 import joblib
+import numpy as np
 import gradio as gr
 
 MODEL_PATH = os.getenv("MODEL_PATH", "model.pkl")
@@ -21,8 +26,11 @@ ANSWERS_PATH = os.getenv("ANSWERS_PATH", "answers.pkl")
 
 def ensure_artifacts():
     need = [MODEL_PATH, VECTORIZER_PATH, ANSWERS_PATH]
-    if not all(pathlib.Path(p).exists() for p in need):
-        print("[INFO] Artifacts missing — training model...")
+    missing = not all(pathlib.Path(p).exists() for p in need)
+    # answers.pkl from before chips/fast path were shipped -> retrain
+    stale = not missing and not {"chips", "fast_path"} <= joblib.load(ANSWERS_PATH).keys()
+    if missing or stale:
+        print(f"[INFO] Artifacts {'missing' if missing else 'outdated'} — training model...")
         subprocess.run(["python", "train_model.py"], check=True)
         print("[INFO] Training finished.")
 
@@ -30,11 +38,27 @@ def ensure_artifacts():
 ensure_artifacts()
 
 # --- Load artifacts ---
-model = joblib.load(MODEL_PATH)
+def dequantize_log_probs(model):
+    """Restore float32 log-probs from a compacted model (mirror train_model.py)."""
+    flp = model.feature_log_prob_
+    if getattr(model, "quant_scale_", None) is not None:
+        model.feature_log_prob_ = (flp.astype(np.float32) + 128) * model.quant_scale_ + model.quant_offset_
+        del model.quant_scale_, model.quant_offset_
+    elif flp.dtype == np.float16:
+        model.feature_log_prob_ = flp.astype(np.float32)
+    return model
+
+model = dequantize_log_probs(joblib.load(MODEL_PATH))
 vectorizer = joblib.load(VECTORIZER_PATH)
 packed = joblib.load(ANSWERS_PATH)
 answers_index = packed["answers_index"]
 PROFILE: Dict[str, Any] = packed["profile"]
+CHIPS: List[tuple] = packed["chips"]  # (button label, prompt) from train_model.CHIP_PROMPTS
+FAST_PATH: Dict[str, Any] = packed["fast_path"]
+FAST_PATH_FILLER = set(FAST_PATH["filler"])
+FAST_PATH_LOG_EVERY = int(os.getenv("FAST_PATH_LOG_EVERY", "500"))
+route_stats: Counter = Counter()
+route_stats_lock = threading.Lock()  # Gradio runs submit/chip handlers in worker threads
 
 # --- Renderers (mirror train_model.py keys) ---
 def render_full_name(p: Dict[str, Any]) -> str:
@@ -133,9 +157,53 @@ RENDERERS: Dict[str, Callable[[Dict[str, Any]], str]] = {
     "personal_life": render_personal,
 }
 
+# --- Fast path (mirror train_model.py normalize/match_fast_path) ---
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(re.findall(r"\w+", text))
+
+def fast_intent(user_text: str) -> Optional[tuple]:
+    """Return (intent, "exact"|"prefix") for known phrases, else None."""
+    norm = normalize(user_text)
+    intent = FAST_PATH["exact"].get(norm)
+    if intent is not None:
+        return intent, "exact"
+    tokens = norm.split()
+    node = FAST_PATH["trie"]
+    for i, tok in enumerate(tokens):
+        node = node.get(tok)
+        if node is None:
+            return None
+        # Prefix hits only when the rest is filler ("please"); anything else goes to NB
+        if "$" in node and all(t in FAST_PATH_FILLER for t in tokens[i + 1:]):
+            return node["$"], "prefix"
+    return None
+
+def log_route_stats(stats: Optional[Counter] = None):
+    if stats is None:
+        with route_stats_lock:
+            stats = route_stats.copy()
+    total = sum(stats.values())
+    if total:
+        skipped = stats["exact"] + stats["prefix"]
+        print(f"[INFO] routing: {total} msgs, exact {stats['exact']}, prefix {stats['prefix']}, "
+              f"model {stats['model']} — {skipped / total:.1%} skipped the classifier")
+
 def route_and_answer(user_text: str) -> str:
-    X = vectorizer.transform([user_text])
-    intent = model.predict(X)[0]
+    hit = fast_intent(user_text)
+    if hit is not None:
+        intent, how = hit
+    else:
+        X = vectorizer.transform([user_text])
+        intent, how = model.predict(X)[0], "model"
+    with route_stats_lock:
+        route_stats[how] += 1
+        snapshot = None
+        if FAST_PATH_LOG_EVERY and sum(route_stats.values()) % FAST_PATH_LOG_EVERY == 0:
+            snapshot = route_stats.copy()
+    if snapshot is not None:
+        log_route_stats(snapshot)
     key = answers_index.get(intent, "help")
     renderer = RENDERERS.get(key, RENDERERS["help"])
     return renderer(PROFILE)
@@ -271,17 +339,7 @@ with gr.Blocks(title="Faruk Hasan – Personal Chatbot", theme=theme, css=custom
         with gr.Column(scale=4, min_width=260, elem_classes=["sidebar"]):
             with gr.Group(elem_classes=["glass"]):
                 gr.Markdown("#### 🔎 Quick Questions")
-                chips = [
-                    gr.Button("Full name", size="sm", elem_classes=["quick-chip"]),
-                    gr.Button("Where are you from?", size="sm", elem_classes=["quick-chip"]),
-                    gr.Button("Where do you live?", size="sm", elem_classes=["quick-chip"]),
-                    gr.Button("Education", size="sm", elem_classes=["quick-chip"]),
-                    gr.Button("Tutoring career", size="sm", elem_classes=["quick-chip"]),
-                    gr.Button("Professional experience", size="sm", elem_classes=["quick-chip"]),
-                    gr.Button("Tools & skills", size="sm", elem_classes=["quick-chip"]),
-                    gr.Button("Childhood", size="sm", elem_classes=["quick-chip"]),
-                    gr.Button("Personal life", size="sm", elem_classes=["quick-chip"]),
-                ]
+                chips = [gr.Button(label, size="sm", elem_classes=["quick-chip"]) for label, _ in CHIPS]
 
     gr.HTML('<div class="footer">© 2025 Faruk Hasan — Personal Chatbot</div>')
 
@@ -344,15 +402,8 @@ with gr.Blocks(title="Faruk Hasan – Personal Chatbot", theme=theme, css=custom
     # Minimize button handler (functionality handled by JavaScript)
     minimize_btn.click(lambda: None)
 
-    chips[0].click(lambda h: inject_and_send("full name", h), inputs=[chat], outputs=[chat])
-    chips[1].click(lambda h: inject_and_send("where are you from", h), inputs=[chat], outputs=[chat])
-    chips[2].click(lambda h: inject_and_send("where do you live", h), inputs=[chat], outputs=[chat])
-    chips[3].click(lambda h: inject_and_send("education", h), inputs=[chat], outputs=[chat])
-    chips[4].click(lambda h: inject_and_send("tutoring career", h), inputs=[chat], outputs=[chat])
-    chips[5].click(lambda h: inject_and_send("professional career", h), inputs=[chat], outputs=[chat])
-    chips[6].click(lambda h: inject_and_send("tools and skills", h), inputs=[chat], outputs=[chat])
-    chips[7].click(lambda h: inject_and_send("childhood", h), inputs=[chat], outputs=[chat])
-    chips[8].click(lambda h: inject_and_send("personal life", h), inputs=[chat], outputs=[chat])
+    for chip, (_, prompt) in zip(chips, CHIPS):
+        chip.click(lambda h, p=prompt: inject_and_send(p, h), inputs=[chat], outputs=[chat])
 
 if __name__ == "__main__":
     demo.launch(server_name="0.0.0.0", server_port=int(os.getenv("PORT", "7860")))
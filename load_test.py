@@ -0,0 +1,270 @@
+# load_test.py
+"""
+End-to-end load test for the Gradio chatbot (app.py).
+- Starts app.py locally (or targets an already running --url)
+- Simulates N concurrent chat sessions through the Gradio queue (/queue/join + SSE),
+  mixing free-text msg.submit events with quick-chip clicks
+- Each session carries its own chat history, so history serialization grows like a real chat
+- Ramps concurrency step by step and reports throughput, latency percentiles,
+  error rate and server CPU/RSS per level
+
+Usage:
+  python load_test.py                          # launch app.py, ramp 1,2,4,8,16,32
+  python load_test.py --levels 1,8,64 --step-seconds 20
+  python load_test.py --url http://127.0.0.1:7860 --pid 12345
+
+Needs httpx (ships with gradio). Server CPU/RSS needs psutil (optional).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+try:
+    import psutil
+except ImportError:  # server stats are optional
+    psutil = None
+
+# Free-text prompts sent through msg.submit (mix of exact, paraphrased and off-topic text)
+FREE_TEXT: List[str] = [
+    "hi", "what is your full name", "where are you from", "where do you live",
+    "tell me about your education", "what do you teach", "where do you work",
+    "what tools do you know", "tell me about your childhood", "do you have kids",
+    "which university did you go to?", "what's your tech stack these days",
+    "how long have you been teaching kids", "are you on linkedin", "thanks",
+]
+
+
+# ---------------------------
+# Endpoint discovery
+# ---------------------------
+def discover_endpoints(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Find fn_index/trigger ids for the textbox submit and the quick-chip clicks from /config."""
+    comps = {c["id"]: c for c in config["components"]}
+    submit = None
+    chips = []
+    for i, dep in enumerate(config["dependencies"]):
+        fn_index = dep.get("id", i)
+        for target_id, event in dep["targets"]:
+            props = comps.get(target_id, {}).get("props", {})
+            if event == "submit" and submit is None:
+                submit = {"fn_index": fn_index, "trigger_id": target_id}
+            elif event == "click" and "quick-chip" in (props.get("elem_classes") or []):
+                chips.append({"fn_index": fn_index, "trigger_id": target_id, "label": props.get("value")})
+    if submit is None or not chips:
+        raise RuntimeError("Could not find msg.submit / quick-chip events in /config")
+    return {"submit": submit, "chips": chips}
+
+
+# ---------------------------
+# One chat session
+# ---------------------------
+class Stats:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors = 0
+        self.by_kind = {"submit": 0, "chip": 0}
+
+    def add(self, kind: str, latency: Optional[float]):
+        self.by_kind[kind] += 1
+        if latency is None:
+            self.errors += 1
+        else:
+            self.latencies.append(latency)
+
+
+async def call_event(client: httpx.AsyncClient, session_hash: str, ep: Dict[str, Any], data: list) -> list:
+    """Join the queue for one event and wait for process_completed on the session SSE stream."""
+    payload = {
+        "data": data,
+        "fn_index": ep["fn_index"],
+        "trigger_id": ep["trigger_id"],
+        "session_hash": session_hash,
+        "event_data": None,
+    }
+    r = await client.post("/queue/join", json=payload)
+    r.raise_for_status()
+    event_id = r.json()["event_id"]
+    async with client.stream("GET", "/queue/data", params={"session_hash": session_hash}) as resp:
+        resp.raise_for_status()
+        async for line in resp.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            msg = json.loads(line[5:])
+            if msg.get("event_id") not in (None, event_id):
+                continue
+            if msg.get("msg") == "process_completed":
+                if not msg.get("success"):
+                    raise RuntimeError(f"event failed: {msg.get('output')}")
+                return msg["output"]["data"]
+            if msg.get("msg") == "close_stream":
+                break
+    raise RuntimeError("stream closed before process_completed")
+
+
+async def run_session(client, endpoints, stats: Stats, stop_at: float, chip_ratio: float,
+                      think_time: float, max_turns: int, rng: random.Random):
+    session_hash = uuid.uuid4().hex[:11]
+    history: list = []
+    while time.perf_counter() < stop_at:
+        if len(history) >= 2 * max_turns:  # user hits "Clear" and starts over
+            history = []
+        if rng.random() < chip_ratio:
+            kind, ep, data = "chip", rng.choice(endpoints["chips"]), [history]
+        else:
+            kind, ep, data = "submit", endpoints["submit"], [rng.choice(FREE_TEXT), history]
+        t0 = time.perf_counter()
+        try:
+            out = await call_event(client, session_hash, ep, data)
+            history = out[-1]  # chatbot is the last output for both event types
+            stats.add(kind, time.perf_counter() - t0)
+        except Exception:
+            stats.add(kind, None)
+        if think_time:
+            await asyncio.sleep(rng.uniform(0, 2 * think_time))
+
+
+# ---------------------------
+# Ramp + reporting
+# ---------------------------
+def percentile(sorted_vals: List[float], q: float) -> float:
+    if not sorted_vals:
+        return float("nan")
+    idx = min(len(sorted_vals) - 1, int(round(q / 100 * (len(sorted_vals) - 1))))
+    return sorted_vals[idx]
+
+
+async def run_level(base_url, endpoints, concurrency, args, proc) -> Dict[str, Any]:
+    stats = Stats()
+    limits = httpx.Limits(max_connections=2 * concurrency + 4)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        if proc is not None:
+            proc.cpu_percent(None)  # reset the CPU counter for this step
+        t0 = time.perf_counter()
+        stop_at = t0 + args.step_seconds
+        await asyncio.gather(*[
+            run_session(client, endpoints, stats, stop_at, args.chip_ratio, args.think_time,
+                        args.max_turns, random.Random(args.seed * 1000 + concurrency * 100 + i))
+            for i in range(concurrency)
+        ])
+        elapsed = time.perf_counter() - t0
+    lat = sorted(stats.latencies)
+    total = len(lat) + stats.errors
+    row = {
+        "concurrency": concurrency,
+        "requests": total,
+        "submit": stats.by_kind["submit"],
+        "chip": stats.by_kind["chip"],
+        "rps": len(lat) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(lat, 50) * 1000,
+        "p90_ms": percentile(lat, 90) * 1000,
+        "p99_ms": percentile(lat, 99) * 1000,
+        "max_ms": (lat[-1] * 1000) if lat else float("nan"),
+        "error_rate": stats.errors / total if total else 0.0,
+        "cpu_pct": None,
+        "rss_mb": None,
+    }
+    if proc is not None:
+        row["cpu_pct"] = proc.cpu_percent(None)
+        row["rss_mb"] = proc.memory_info().rss / 1e6
+    return row
+
+
+def print_row(row: Dict[str, Any]):
+    cpu = f"{row['cpu_pct']:7.1f}" if row["cpu_pct"] is not None else "    n/a"
+    rss = f"{row['rss_mb']:8.1f}" if row["rss_mb"] is not None else "     n/a"
+    print(f"{row['concurrency']:>5} {row['requests']:>8} {row['rps']:>8.1f} "
+          f"{row['p50_ms']:>8.1f} {row['p90_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['max_ms']:>8.1f} "
+          f"{row['error_rate'] * 100:>6.2f}% {cpu} {rss}", flush=True)
+
+
+def start_app(port: int) -> subprocess.Popen:
+    env = dict(os.environ, PORT=str(port))
+    return subprocess.Popen([sys.executable, "app.py"], env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_for_config(base_url: str, timeout: float, server: Optional[subprocess.Popen]) -> Dict[str, Any]:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if server is not None and server.poll() is not None:
+            raise RuntimeError(f"app.py exited with code {server.returncode}")
+        try:
+            r = httpx.get(f"{base_url}/config", timeout=2)
+            if r.status_code == 200:
+                return r.json()
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"App at {base_url} did not come up within {timeout:.0f}s")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--url", help="Target a running app instead of launching app.py")
+    ap.add_argument("--pid", type=int, help="Server PID for CPU/RSS when using --url")
+    ap.add_argument("--port", type=int, default=7870, help="Port for the launched app.py")
+    ap.add_argument("--levels", default="1,2,4,8,16,32", help="Comma-separated concurrency steps")
+    ap.add_argument("--step-seconds", type=float, default=15.0, help="Duration of each step")
+    ap.add_argument("--chip-ratio", type=float, default=0.4, help="Share of turns that are quick-chip clicks")
+    ap.add_argument("--think-time", type=float, default=0.0, help="Mean pause between turns (s)")
+    ap.add_argument("--max-turns", type=int, default=20, help="Turns before a session clears its history")
+    ap.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout (s)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--json", dest="json_path", help="Also write the per-level rows to this file")
+    args = ap.parse_args()
+
+    levels = [int(x) for x in args.levels.split(",") if x.strip()]
+    server = None
+    if args.url:
+        base_url = args.url.rstrip("/")
+        pid = args.pid
+    else:
+        server = start_app(args.port)
+        base_url = f"http://127.0.0.1:{args.port}"
+        pid = server.pid
+
+    proc = None
+    if pid is not None:
+        if psutil is None:
+            print("[WARN] psutil not installed — server CPU/RSS will be reported as n/a")
+        else:
+            proc = psutil.Process(pid)
+
+    rows = []
+    try:
+        config = wait_for_config(base_url, 120, server)
+        endpoints = discover_endpoints(config)
+        print(f"[INFO] {base_url} — submit fn {endpoints['submit']['fn_index']}, "
+              f"{len(endpoints['chips'])} quick chips, {args.step_seconds:.0f}s per step")
+        print(f"{'conc':>5} {'reqs':>8} {'rps':>8} {'p50ms':>8} {'p90ms':>8} {'p99ms':>8} {'maxms':>8} "
+              f"{'errors':>7} {'cpu%':>7} {'rss_mb':>8}")
+        for c in levels:
+            row = asyncio.run(run_level(base_url, endpoints, c, args, proc))
+            rows.append(row)
+            print_row(row)
+    finally:
+        if server is not None:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(rows, f, indent=2)
+        print("Saved:", args.json_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,16 +5,31 @@ Structured-personal-bot trainer:
 - Builds intent classifier (Naive Bayes) for routing
 - Renders answers deterministically from PROFILE
 
+- Compacts the router at training time: min_df, chi²/MI n-gram selection,
+  optional float16/int8 log-prob tables (see `python train_model.py --help`)
+- Builds an exact-match table + prefix trie of training phrases and chip prompts
+
 Outputs:
   model.pkl
   vectorizer.pkl
-  answers.pkl  (maps intent -> renderer key + ships PROFILE)
+  answers.pkl  (maps intent -> renderer key + ships PROFILE, chip prompts, fast-path tables)
 """
 
+import argparse
+import copy
+import io
+import re
+import time
+import unicodedata
+from functools import partial
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
 import joblib
-from typing import Dict, Any, Iterable, List
+import numpy as np
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.feature_selection import chi2, mutual_info_classif
+from sklearn.model_selection import StratifiedKFold
 
 # ---------------------------
 # 1) YOUR PROFILE (filled from your about_me HTML)
@@ -214,6 +229,29 @@ TRAIN_DEFAULTS: Dict[str, Dict[str, Iterable[str]]] = {
     ]},
 }
 
+# Quick-chip buttons: (button label, prompt sent, intent). Shipped in answers.pkl;
+# app.py builds its chip buttons and click bindings from this list.
+CHIP_PROMPTS: List[Tuple[str, str, str]] = [
+    ("Full name", "full name", "full_name"),
+    ("Where are you from?", "where are you from", "origin"),
+    ("Where do you live?", "where do you live", "current_location"),
+    ("Education", "education", "education"),
+    ("Tutoring career", "tutoring career", "tutoring_career"),
+    ("Professional experience", "professional career", "professional_career"),
+    ("Tools & skills", "tools and skills", "tools_and_skills"),
+    ("Childhood", "childhood", "childhood"),
+    ("Personal life", "personal life", "personal_life"),
+]
+
+# Paraphrased / held-out queries used to check the fast path against NB at training time
+FAST_PATH_PROBES: List[str] = [
+    "Where are you from?!", "where are you from please", "full name please", "tools and skills?",
+    "where are you from originally", "where do you live now", "what do you teach on outschool",
+    "who are you married to", "what do you teach kids and what tools do you know",
+    "how are you using selenium in your job", "how are you with python and docker",
+    "tell me about your education and your job", "hi what is your education", "name of your university",
+]
+
 # ---------------------------------------
 # 3) RENDERERS: PROFILE -> Nice sentences
 # ---------------------------------------
@@ -313,6 +351,11 @@ RENDERERS = {
     "personal_life": render_personal,
 }
 
+SCORE_FUNCS = {
+    "chi2": lambda Xv, y: chi2(Xv, y)[0],
+    "mutual_info": partial(mutual_info_classif, discrete_features=True, random_state=0),
+}
+
 # ---------------------------------------------------
 # 4) Train classifier (intent routing) and dump data
 # ---------------------------------------------------
@@ -324,26 +367,258 @@ def build_training_corpus(intents: Dict[str, Dict[str, Iterable[str]]]):
             y.append(label)
     return X, y
 
+def fit_router(
+    X: List[str],
+    y: List[str],
+    min_df: int = 1,
+    select: Optional[str] = None,
+    k_best: Optional[float] = None,
+    quantize: Optional[str] = None,
+):
+    """Fit vectorizer + NB. With select+k_best and/or quantize set, returns a compacted pair."""
+    if (select is None) != (k_best is None):
+        raise ValueError("select and k_best must be given together")
+    if k_best is not None and k_best <= 0:
+        raise ValueError(f"k_best must be > 0, got {k_best}")
+    vectorizer = CountVectorizer(ngram_range=(1, 2), lowercase=True, strip_accents="unicode", min_df=min_df)
+    Xv = vectorizer.fit_transform(X)
+
+    if select:
+        # Keep the k best n-grams, then rebuild the vectorizer on that vocabulary only
+        n_features = Xv.shape[1]
+        k = int(round(k_best * n_features)) if k_best <= 1 else int(k_best)
+        k = min(max(k, 1), n_features)
+        scores = np.nan_to_num(SCORE_FUNCS[select](Xv, y))
+        keep = np.sort(np.argsort(-scores, kind="stable")[:k])
+        terms = vectorizer.get_feature_names_out()[keep]
+        vectorizer = CountVectorizer(ngram_range=(1, 2), lowercase=True, strip_accents="unicode",
+                                     vocabulary={t: i for i, t in enumerate(terms)})
+        Xv = vectorizer.fit_transform(X)
+
+    model = MultinomialNB()
+    model.fit(Xv, y)
+
+    if select or quantize:
+        # Only needed for partial_fit; predict uses feature_log_prob_ + class_log_prior_
+        del model.feature_count_, model.class_count_
+    if quantize:
+        quantize_log_probs(model, quantize)
+    return vectorizer, model
+
+def quantize_log_probs(model: MultinomialNB, mode: str):
+    """Store feature_log_prob_ as float16, or as int8 with a per-class scale/offset."""
+    flp = model.feature_log_prob_
+    if mode == "float16":
+        model.feature_log_prob_ = flp.astype(np.float16)
+    elif mode == "int8":
+        lo = flp.min(axis=1, keepdims=True)
+        scale = (flp.max(axis=1, keepdims=True) - lo) / 255.0
+        scale[scale == 0] = 1.0
+        model.feature_log_prob_ = (np.round((flp - lo) / scale) - 128).astype(np.int8)
+        model.quant_scale_ = scale.astype(np.float32)
+        model.quant_offset_ = lo.astype(np.float32)
+    else:
+        raise ValueError(f"Unknown quantize mode: {mode!r} (use float16 or int8)")
+
+def dequantize_log_probs(model: MultinomialNB) -> MultinomialNB:
+    """Inverse of quantize_log_probs, applied at load time (mirrored in app.py)."""
+    flp = model.feature_log_prob_
+    if getattr(model, "quant_scale_", None) is not None:
+        model.feature_log_prob_ = (flp.astype(np.float32) + 128) * model.quant_scale_ + model.quant_offset_
+        del model.quant_scale_, model.quant_offset_
+    elif flp.dtype == np.float16:
+        model.feature_log_prob_ = flp.astype(np.float32)
+    return model
+
+# ---------------------------------------------------
+# 5) Fast path: exact / prefix lookup ahead of the NB router
+# ---------------------------------------------------
+# A prefix hit only counts when everything after the phrase is one of these (punctuation is
+# already dropped by normalize); "where are you from originally" still goes to NB.
+FILLER_TOKENS = ["please", "pls", "plz", "thanks", "thx", "ok"]
+
+def normalize(text: str) -> str:
+    """Lowercase, strip accents and punctuation, collapse whitespace (mirrored in app.py)."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(re.findall(r"\w+", text))
+
+def build_fast_path(intents: Dict[str, Dict[str, Iterable[str]]], chips: List[Tuple[str, str, str]]) -> Dict[str, Any]:
+    """Exact table + token trie of normalized phrases. Phrases claimed by two intents are left to NB."""
+    owners: Dict[str, set] = {}
+    for label, obj in intents.items():
+        for phrase in obj["x"]:
+            owners.setdefault(normalize(phrase), set()).add(label)
+    for _, prompt, label in chips:
+        owners.setdefault(normalize(prompt), set()).add(label)
+    exact = {k: next(iter(v)) for k, v in owners.items() if k and len(v) == 1}
+
+    # Token trie; "$" marks the end of a phrase (never a token, normalize drops punctuation)
+    trie: Dict[str, Any] = {}
+    for phrase, label in exact.items():
+        node = trie
+        for tok in phrase.split():
+            node = node.setdefault(tok, {})
+        node["$"] = label
+    return {"exact": exact, "trie": trie, "filler": FILLER_TOKENS}
+
+def match_fast_path(fast_path: Dict[str, Any], text: str) -> Optional[tuple]:
+    """Return (intent, "exact"|"prefix") for known phrases, else None (mirrored in app.py)."""
+    norm = normalize(text)
+    intent = fast_path["exact"].get(norm)
+    if intent is not None:
+        return intent, "exact"
+    tokens = norm.split()
+    node, filler = fast_path["trie"], set(fast_path["filler"])
+    for i, tok in enumerate(tokens):
+        node = node.get(tok)
+        if node is None:
+            return None
+        if "$" in node and all(t in filler for t in tokens[i + 1:]):
+            return node["$"], "prefix"
+    return None
+
+def fast_path_report(fast_path: Dict[str, Any], X: List[str], vectorizer, model):
+    exact = fast_path["exact"]
+    model = dequantize_log_probs(copy.deepcopy(model))
+    fixed = sum(1 for k, label in exact.items() if model.predict(vectorizer.transform([k]))[0] != label)
+    chips_hit = sum(1 for _, p, _ in CHIP_PROMPTS if normalize(p) in exact)
+    print(f"Fast path: {len(exact)} exact phrases, {len(fast_path['trie'])} trie roots; "
+          f"chips {chips_hit}/{len(CHIP_PROMPTS)}, training phrases {sum(normalize(x) in exact for x in X)}/{len(X)}; "
+          f"{fixed} exact phrases NB would misroute")
+
+    hits, differs = 0, []
+    for probe in FAST_PATH_PROBES:
+        hit = match_fast_path(fast_path, probe)
+        if hit is None:
+            continue
+        hits += 1
+        nb = model.predict(vectorizer.transform([probe]))[0]
+        if nb != hit[0]:
+            differs.append(f"{probe!r}: {hit[1]} {hit[0]} vs NB {nb}")
+    print(f"Fast path probes: {hits}/{len(FAST_PATH_PROBES)} skip NB, {len(differs)} routed differently from NB")
+    for line in differs:
+        print("   •", line)
+
+# ---------------------------------------------------
+# 6) Compaction report (accuracy vs size / latency)
+# ---------------------------------------------------
+def _dumped(obj) -> bytes:
+    buf = io.BytesIO()
+    joblib.dump(obj, buf)
+    return buf.getvalue()
+
+def _measure(X: List[str], y: List[str], vectorizer, model, repeats: int = 20) -> Dict[str, float]:
+    blob_v, blob_m = _dumped(vectorizer), _dumped(model)
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        joblib.load(io.BytesIO(blob_v))
+        served = dequantize_log_probs(joblib.load(io.BytesIO(blob_m)))
+    load_ms = (time.perf_counter() - t0) / repeats * 1000
+
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        for text in X:  # one message at a time, like route_and_answer
+            served.predict(vectorizer.transform([text]))
+    query_us = (time.perf_counter() - t0) / (repeats * len(X)) * 1e6
+
+    train_acc = float(np.mean(served.predict(vectorizer.transform(X)) == np.asarray(y)))
+    return {
+        "features": len(vectorizer.vocabulary_),
+        "bytes": len(blob_v) + len(blob_m),
+        "load_ms": load_ms,
+        "query_us": query_us,
+        "train_acc": train_acc,
+    }
+
+def _cv_accuracy(X: List[str], y: List[str], opts: Dict[str, Any], folds: int = 3) -> float:
+    X_arr, y_arr = np.asarray(X, dtype=object), np.asarray(y)
+    hits = 0
+    for tr, te in StratifiedKFold(n_splits=folds, shuffle=True, random_state=0).split(X_arr, y_arr):
+        vectorizer, model = fit_router(list(X_arr[tr]), list(y_arr[tr]), **opts)
+        model = dequantize_log_probs(model)
+        hits += int(np.sum(model.predict(vectorizer.transform(list(X_arr[te]))) == y_arr[te]))
+    return hits / len(X)
+
+def compaction_report(X: List[str], y: List[str], compact_opts: Dict[str, Any]):
+    full = fit_router(X, y)
+    compact = fit_router(X, y, **compact_opts)
+    rows = [("full", _measure(X, y, *full), _cv_accuracy(X, y, {})),
+            ("compact", _measure(X, y, *compact), _cv_accuracy(X, y, compact_opts))]
+    applied = {k: v for k, v in compact_opts.items() if v is not None}
+    print("Compaction:", ", ".join(f"{k}={v}" for k, v in applied.items()))
+    print(f"{'':8} {'features':>8} {'bytes':>8} {'load_ms':>8} {'query_us':>9} {'train_acc':>9} {'cv_acc':>7}")
+    for name, m, cv in rows:
+        print(f"{name:8} {m['features']:>8} {m['bytes']:>8} {m['load_ms']:>8.2f} {m['query_us']:>9.1f} "
+              f"{m['train_acc']:>9.3f} {cv:>7.3f}")
+    (_, f, f_cv), (_, c, c_cv) = rows
+    print(f"delta    size {c['bytes'] / f['bytes'] - 1:+.1%}, cv_acc {c_cv - f_cv:+.3f}, "
+          f"train_acc {c['train_acc'] - f['train_acc']:+.3f}")
+
 def train_and_dump(
     model_path="model.pkl",
     vectorizer_path="vectorizer.pkl",
-    answers_path="answers.pkl"
+    answers_path="answers.pkl",
+    min_df=1,
+    select=None,
+    k_best=None,
+    quantize="float16",
+    report=True,
 ):
     X, y = build_training_corpus(TRAIN_DEFAULTS)
-    vectorizer = CountVectorizer(ngram_range=(1, 2), lowercase=True, strip_accents="unicode")
-    Xv = vectorizer.fit_transform(X)
-    model = MultinomialNB()
-    model.fit(Xv, y)
+    opts = dict(min_df=min_df, select=select, k_best=k_best, quantize=quantize)
+    vectorizer, model = fit_router(X, y, **opts)
 
     joblib.dump(model, model_path)
     joblib.dump(vectorizer, vectorizer_path)
 
     # Store renderer keys + the full PROFILE (so app serves from structured data)
+    # + the quick-chip prompts and the exact/prefix fast-path tables that skip the classifier
+    fast_path = build_fast_path(TRAIN_DEFAULTS, CHIP_PROMPTS)
     joblib.dump(
-        {"answers_index": {k: k for k in RENDERERS.keys()}, "profile": PROFILE},
+        {"answers_index": {k: k for k in RENDERERS.keys()}, "profile": PROFILE,
+         "chips": [(label, prompt) for label, prompt, _ in CHIP_PROMPTS], "fast_path": fast_path},
         answers_path
     )
     print("Saved:", model_path, vectorizer_path, answers_path)
+    if report:
+        fast_path_report(fast_path, X, vectorizer, model)
+        compaction_report(X, y, opts)
+
+def _parse_k(value: str) -> Optional[float]:
+    if value.lower() in ("", "none", "all"):
+        return None
+    try:
+        k = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a number or 'all', got {value!r}")
+    if k <= 0:
+        raise argparse.ArgumentTypeError(f"must be > 0, got {value}")
+    return k
 
 if __name__ == "__main__":
-    train_and_dump()
+    parser = argparse.ArgumentParser(description="Train the intent router and dump artifacts.")
+    parser.add_argument("--min-df", type=int, default=1, help="Drop n-grams seen in fewer phrases")
+    parser.add_argument("--select", choices=[*SCORE_FUNCS, "none"], default=None,
+                        help="Feature selection score (default chi2 when --k-best is given)")
+    parser.add_argument("--k-best", type=_parse_k, default=None,
+                        help="Features to keep: count (>1), fraction (<=1) or 'all'")
+    parser.add_argument("--quantize", choices=["float16", "int8", "none"], default="float16",
+                        help="Storage type for the NB log-prob table")
+    parser.add_argument("--no-report", action="store_true", help="Skip the accuracy/size/latency report")
+    args = parser.parse_args()
+    if args.k_best is None:
+        if args.select not in (None, "none"):
+            parser.error("--select needs --k-best")
+        args.select = None
+    elif args.select == "none":
+        parser.error("--k-best cannot be used with --select none")
+    elif args.select is None:
+        args.select = "chi2"
+    train_and_dump(
+        min_df=args.min_df,
+        select=args.select,
+        k_best=args.k_best,
+        quantize=None if args.quantize == "none" else args.quantize,
+        report=not args.no_report,
+    )